@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from cinema.tests.samples import (
+    sample_actor,
+    sample_genre,
+    sample_movie,
+    sample_movie_session,
+)
+
+
+@pytest.fixture(scope="class")
+def cinema_graph(django_db_setup, django_db_blocker):
+    """Create the admin/movie/session graph once per test class.
+
+    Everything is created inside a transaction that is rolled back when
+    the class finishes, while each test runs in its own savepoint. Tests
+    still need the django_db mark to query the database.
+    """
+    atomic = transaction.atomic()
+
+    with django_db_blocker.unblock():
+        atomic.__enter__()
+        try:
+            # Clients use force_authenticate, so skip hashing a password
+            user = get_user_model().objects.create_superuser(
+                "admin@myproject.com", None
+            )
+            movie = sample_movie()
+            movie_session = sample_movie_session(movie=movie)
+            graph = SimpleNamespace(
+                user=user,
+                movie=movie,
+                genre=sample_genre(),
+                actor=sample_actor(),
+                cinema_hall=movie_session.cinema_hall,
+                movie_session=movie_session,
+            )
+        except BaseException:
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+            raise
+
+    yield graph
+
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_api_client(api_client, cinema_graph):
+    api_client.force_authenticate(cinema_graph.user)
+    return api_client
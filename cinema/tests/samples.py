@@ -0,0 +1,55 @@
+from cinema.models import Actor, CinemaHall, Genre, Movie, MovieSession
+
+
+def build_movie(**params):
+    defaults = {
+        "title": "Sample movie",
+        "description": "Sample description",
+        "duration": 90,
+    }
+    defaults.update(params)
+
+    return Movie(**defaults)
+
+
+def sample_movie(**params):
+    movie = build_movie(**params)
+    movie.save()
+
+    return movie
+
+
+def sample_movies(*params_list):
+    """Create several movies with a single INSERT"""
+    return Movie.objects.bulk_create(
+        [build_movie(**params) for params in params_list]
+    )
+
+
+def sample_genre(**params):
+    defaults = {
+        "name": "Drama",
+    }
+    defaults.update(params)
+
+    return Genre.objects.create(**defaults)
+
+
+def sample_actor(**params):
+    defaults = {"first_name": "George", "last_name": "Clooney"}
+    defaults.update(params)
+
+    return Actor.objects.create(**defaults)
+
+
+def sample_movie_session(**params):
+    cinema_hall = CinemaHall.objects.create(name="Blue", rows=20, seats_in_row=20)
+
+    defaults = {
+        "show_time": "2022-06-02 14:00:00Z",
+        "movie": None,
+        "cinema_hall": cinema_hall,
+    }
+    defaults.update(params)
+
+    return MovieSession.objects.create(**defaults)
@@ -1,174 +1,155 @@
-import os
-import tempfile
+import functools
+import io
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from PIL import Image
+import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from cinema.models import Actor, CinemaHall, Genre, Movie, MovieSession
-from cinema.serializers import MovieListSerializer, MovieDetailSerializer
-from cinema.tests.test_movies_api import MOVIE_LIST_URL
+from cinema.models import Movie, Order, Ticket
+from cinema.serializers import MovieListSerializer
+from cinema.tests.samples import (
+    sample_actor,
+    sample_genre,
+    sample_movie,
+    sample_movie_session,
+    sample_movies,
+)
 
 MOVIE_URL = reverse("cinema:movie-list")
 MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
 
 
-def sample_movie(**params):
-    defaults = {
-        "title": "Sample movie",
-        "description": "Sample description",
-        "duration": 90,
-    }
-    defaults.update(params)
+def encode_sample_image():
+    """Return the bytes of a small JPEG image"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10)).save(buffer, format="JPEG")
+    return buffer.getvalue()
 
-    return Movie.objects.create(**defaults)
 
+SAMPLE_IMAGE_BYTES = encode_sample_image()
 
-def sample_genre(**params):
-    defaults = {
-        "name": "Drama",
-    }
-    defaults.update(params)
-
-    return Genre.objects.create(**defaults)
 
+@functools.lru_cache(maxsize=None)
+def image_upload_url(movie_id):
+    """Return URL for recipe image upload"""
+    return reverse("cinema:movie-upload-image", args=[movie_id])
 
-def sample_actor(**params):
-    defaults = {"first_name": "George", "last_name": "Clooney"}
-    defaults.update(params)
 
-    return Actor.objects.create(**defaults)
+@functools.lru_cache(maxsize=None)
+def detail_url(movie_id):
+    return reverse("cinema:movie-detail", args=[movie_id])
 
 
-def sample_movie_session(**params):
-    cinema_hall = CinemaHall.objects.create(name="Blue", rows=20, seats_in_row=20)
+def upload_image(client, movie):
+    """Upload the sample image to the movie through the API"""
+    url = image_upload_url(movie.id)
+    image = SimpleUploadedFile(
+        "image.jpg", SAMPLE_IMAGE_BYTES, content_type="image/jpeg"
+    )
+    return client.post(url, {"image": image}, format="multipart")
 
-    defaults = {
-        "show_time": "2022-06-02 14:00:00",
-        "movie": None,
-        "cinema_hall": cinema_hall,
-    }
-    defaults.update(params)
 
-    return MovieSession.objects.create(**defaults)
+def attach_image(movie):
+    """Store the sample image on the movie directly, bypassing the API"""
+    movie.image.save("image.jpg", ContentFile(SAMPLE_IMAGE_BYTES))
 
 
-def image_upload_url(movie_id):
-    """Return URL for recipe image upload"""
-    return reverse("cinema:movie-upload-image", args=[movie_id])
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Store uploaded files in a per-test directory instead of MEDIA_ROOT"""
+    settings.MEDIA_ROOT = tmp_path
 
 
-def detail_url(movie_id):
-    return reverse("cinema:movie-detail", args=[movie_id])
+@pytest.fixture
+def movie(cinema_graph):
+    return Movie.objects.get(pk=cinema_graph.movie.pk)
 
 
-class MovieImageUploadTests(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_superuser(
-            "admin@myproject.com", "password"
-        )
-        self.client.force_authenticate(self.user)
-        self.movie = sample_movie()
-        self.genre = sample_genre()
-        self.actor = sample_actor()
-        self.movie_session = sample_movie_session(movie=self.movie)
+@pytest.mark.django_db
+@pytest.mark.usefixtures("media_root")
+class TestMovieImageUpload:
+    def test_upload_image_to_movie(self, admin_api_client, movie):
+        """Test uploading an image to movie"""
+        res = upload_image(admin_api_client, movie)
+        movie.refresh_from_db()
 
-    def tearDown(self):
-        self.movie.image.delete()
+        assert res.status_code == status.HTTP_200_OK
+        assert "image" in res.data
+        assert movie.image.storage.exists(movie.image.name)
 
-    def test_upload_image_to_movie(self):
-        """Test uploading an image to movie"""
-        url = image_upload_url(self.movie.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            res = self.client.post(url, {"image": ntf}, format="multipart")
-        self.movie.refresh_from_db()
-
-        self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn("image", res.data)
-        self.assertTrue(os.path.exists(self.movie.image.path))
-
-    def test_upload_image_bad_request(self):
+    def test_upload_image_bad_request(self, admin_api_client, movie):
         """Test uploading an invalid image"""
-        url = image_upload_url(self.movie.id)
-        res = self.client.post(url, {"image": "not image"}, format="multipart")
+        url = image_upload_url(movie.id)
+        res = admin_api_client.post(
+            url, {"image": "not image"}, format="multipart"
+        )
 
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_post_image_to_movie_list(self):
+    def test_post_image_to_movie_list(self, admin_api_client, cinema_graph):
         url = MOVIE_URL
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            res = self.client.post(
-                url,
-                {
-                    "title": "Title",
-                    "description": "Description",
-                    "duration": 90,
-                    "genres": [1],
-                    "actors": [1],
-                    "image": ntf,
-                },
-                format="multipart",
-            )
-
-        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        image = SimpleUploadedFile(
+            "image.jpg", SAMPLE_IMAGE_BYTES, content_type="image/jpeg"
+        )
+        res = admin_api_client.post(
+            url,
+            {
+                "title": "Title",
+                "description": "Description",
+                "duration": 90,
+                "genres": [cinema_graph.genre.id],
+                "actors": [cinema_graph.actor.id],
+                "image": image,
+            },
+            format="multipart",
+        )
+
+        assert res.status_code == status.HTTP_201_CREATED
         movie = Movie.objects.get(title="Title")
-        self.assertFalse(movie.image)
-
-    def test_image_url_is_shown_on_movie_detail(self):
-        url = image_upload_url(self.movie.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            self.client.post(url, {"image": ntf}, format="multipart")
-        res = self.client.get(detail_url(self.movie.id))
-
-        self.assertIn("image", res.data)
-
-    def test_image_url_is_shown_on_movie_list(self):
-        url = image_upload_url(self.movie.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            self.client.post(url, {"image": ntf}, format="multipart")
-        res = self.client.get(MOVIE_URL)
-
-        self.assertIn("image", res.data[0].keys())
-
-    def test_image_url_is_shown_on_movie_session_detail(self):
-        url = image_upload_url(self.movie.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            self.client.post(url, {"image": ntf}, format="multipart")
-        res = self.client.get(MOVIE_SESSION_URL)
-
-        self.assertIn("movie_image", res.data[0].keys())
-
-
-class UnauthenticatedMovieListAPITests(TestCase):
+        assert not movie.image
+
+    @pytest.mark.parametrize(
+        "endpoint, key",
+        [
+            (detail_url, "image"),
+            (MOVIE_URL, "image"),
+            (MOVIE_SESSION_URL, "movie_image"),
+        ],
+        ids=["movie_detail", "movie_list", "movie_session_list"],
+    )
+    def test_image_url_is_shown(self, admin_api_client, movie, endpoint, key):
+        attach_image(movie)
+        url = endpoint(movie.id) if callable(endpoint) else endpoint
+        res = admin_api_client.get(url)
+
+        data = res.data[0] if isinstance(res.data, list) else res.data
+        assert res.status_code == status.HTTP_200_OK
+        assert data[key]
+        assert data[key].endswith(movie.image.name)
+
+
+class UnauthenticatedMovieListAPITests(SimpleTestCase):
     def setUp(self):
         self.client = APIClient()
 
-    def detail_movie_url(self, movie_id):
-        return reverse("cinema:movie-detail", args=[movie_id])
-
     def test_unauthenticated_movie_list(self):
         response = self.client.get(MOVIE_URL)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+
+class UnauthenticatedMovieRetrieveAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def detail_movie_url(self, movie_id):
+        return reverse("cinema:movie-detail", args=[movie_id])
+
     def test_unauthenticated_movie_retrieve(self):
         cinema = sample_movie()
         url = self.detail_movie_url(cinema.pk)
@@ -177,12 +158,15 @@ class UnauthenticatedMovieListAPITests(TestCase):
 
 
 class AuthenticatedMovieListAPITests(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             email="test@test.com",
             password="test_password",
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_movie_list(self):
@@ -191,18 +175,23 @@ class AuthenticatedMovieListAPITests(TestCase):
         genre = sample_genre(name="Action")
         movie.genres.add(genre)
         movie.actors.add(actor)
-        response = self.client.get(MOVIE_URL)
-        movies = Movie.objects.all()
-        serializer = MovieListSerializer(movies, many=True)
+        with self.assertNumQueries(3):
+            response = self.client.get(MOVIE_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["id"], movie.id)
+        self.assertEqual(response.data[0]["title"], movie.title)
+        self.assertEqual(response.data[0]["genres"], [genre.name])
+        self.assertEqual(response.data[0]["actors"], [actor.full_name])
 
     def test_filter_movie_by_title(self):
-        movie = sample_movie()
-        movie1 = sample_movie(
-            title="Movie2",
-            description="Movie Description",
-            duration=110,
+        movie, movie1 = sample_movies(
+            {},
+            {
+                "title": "Movie2",
+                "description": "Movie Description",
+                "duration": 110,
+            },
         )
         response = self.client.get(MOVIE_URL, {f"title": movie.title})
         serializer_movie = MovieListSerializer(movie)
@@ -211,12 +200,7 @@ class AuthenticatedMovieListAPITests(TestCase):
         self.assertNotIn(serializer_movie1.data, response.data)
 
     def test_filter_movie_by_genre(self):
-        movie = sample_movie(
-            title="Movie",
-        )
-        movie1 = sample_movie(
-            title="Movie1",
-        )
+        movie, movie1 = sample_movies({"title": "Movie"}, {"title": "Movie1"})
         genre = sample_genre(name="Action")
         movie.genres.add(genre)
         serializer_with_genre = MovieListSerializer(movie)
@@ -227,8 +211,7 @@ class AuthenticatedMovieListAPITests(TestCase):
         self.assertNotIn(serializer_without_genre.data, response.data)
 
     def test_filter_movie_by_actor(self):
-        movie = sample_movie()
-        movie1 = sample_movie()
+        movie, movie1 = sample_movies({}, {})
         actor = sample_actor(first_name="Igor", last_name="Omlet")
         movie.actors.add(actor)
         serializer_with_actor = MovieListSerializer(movie)
@@ -240,15 +223,35 @@ class AuthenticatedMovieListAPITests(TestCase):
 
     def test_movie_retrieve(self):
         movie = sample_movie()
+        genre = sample_genre(name="Action")
+        actor = sample_actor(first_name="Cruz", last_name="Ramirez")
+        movie.genres.add(genre)
+        movie.actors.add(actor)
         movie_url = detail_url(movie.id)
         response = self.client.get(movie_url)
-        serializer = MovieDetailSerializer(movie)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data["id"], movie.id)
+        self.assertEqual(response.data["title"], movie.title)
+        self.assertEqual(response.data["description"], movie.description)
+        self.assertEqual(response.data["duration"], movie.duration)
+        self.assertEqual(
+            response.data["genres"], [{"id": genre.id, "name": genre.name}]
+        )
+        self.assertEqual(
+            response.data["actors"],
+            [
+                {
+                    "id": actor.id,
+                    "first_name": actor.first_name,
+                    "last_name": actor.last_name,
+                    "full_name": actor.full_name,
+                }
+            ],
+        )
 
     def test_create_movie_forbidden(self):
         response = self.client.post(
-            MOVIE_LIST_URL,
+            MOVIE_URL,
             {
                 "title": "Test Movie",
                 "description": "Test Movie Description",
@@ -257,14 +260,70 @@ class AuthenticatedMovieListAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
-class AdmiCinemaTests(TestCase):
+class AuthenticatedMovieSessionAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test_password",
+        )
+
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+        self.client.force_authenticate(self.user)
+
+    def test_movie_session_list(self):
+        movie_session = sample_movie_session(movie=sample_movie())
+        with self.assertNumQueries(1):
+            response = self.client.get(MOVIE_SESSION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cinema_hall = movie_session.cinema_hall
+        self.assertEqual(
+            response.data[0]["movie_title"], movie_session.movie.title
+        )
+        self.assertEqual(
+            response.data[0]["cinema_hall_name"], cinema_hall.name
+        )
+        self.assertEqual(
+            response.data[0]["cinema_hall_capacity"], cinema_hall.capacity
+        )
+        self.assertEqual(
+            response.data[0]["tickets_available"], cinema_hall.capacity
+        )
+
+    def test_movie_session_retrieve(self):
+        movie = sample_movie()
+        genre = sample_genre(name="Action")
+        actor = sample_actor(first_name="Cruz", last_name="Ramirez")
+        movie.genres.add(genre)
+        movie.actors.add(actor)
+        movie_session = sample_movie_session(movie=movie)
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            movie_session=movie_session, order=order, row=1, seat=1
+        )
+        url = reverse("cinema:moviesession-detail", args=[movie_session.id])
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["movie"]["genres"], [genre.name])
+        self.assertEqual(response.data["movie"]["actors"], [actor.full_name])
+        self.assertEqual(
+            response.data["taken_places"], [{"row": 1, "seat": 1}]
+        )
+
+
+class AdmiCinemaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             email="test@test.com",
             password="PASSWORD",
             is_staff=True,
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_create_movie(self):
@@ -273,7 +332,7 @@ class AdmiCinemaTests(TestCase):
             "description": "Test Movie Description",
             "duration": 110,
         }
-        response = self.client.post(MOVIE_LIST_URL, data)
+        response = self.client.post(MOVIE_URL, data)
         movie = Movie.objects.get(id=response.data["id"])
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         for key in data:
@@ -287,7 +346,7 @@ class AdmiCinemaTests(TestCase):
             "duration": 110,
             "genres": [genre.id],
         }
-        response = self.client.post(MOVIE_LIST_URL, data)
+        response = self.client.post(MOVIE_URL, data)
         movie = Movie.objects.get(id=response.data["id"])
         genres = movie.genres.all()
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -71,7 +71,7 @@ class MovieViewSet(
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Movie.objects.prefetch_related("genres", "actors")
+    queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
@@ -100,6 +100,9 @@ class MovieViewSet(
             actors_ids = self._params_to_ints(actors)
             queryset = queryset.filter(actors__id__in=actors_ids)
 
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related("genres", "actors")
+
         return queryset.distinct()
 
     def get_serializer_class(self):
@@ -203,6 +206,22 @@ class MovieSessionViewSet(viewsets.ModelViewSet):
         if movie_id_str:
             queryset = queryset.filter(movie_id=int(movie_id_str))
 
+        if self.action == "list":
+            queryset = queryset.only(
+                "id",
+                "show_time",
+                "movie__title",
+                "movie__image",
+                "cinema_hall__name",
+                "cinema_hall__rows",
+                "cinema_hall__seats_in_row",
+            )
+
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                "movie__genres", "movie__actors", "tickets"
+            )
+
         return queryset
 
     @extend_schema(
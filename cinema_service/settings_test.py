@@ -0,0 +1,14 @@
+from cinema_service.settings import *  # noqa: F401, F403
+
+
+# PBKDF2 is deliberately slow; tests only need users to be created
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Keep the test database on disk so pytest --reuse-db can skip rebuilding
+# the schema between runs; pass --create-db after changing models
+DATABASES = {
+    "default": {
+        **DATABASES["default"],  # noqa: F405
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},  # noqa: F405
+    }
+}